@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 import contextlib
+import functools
 from abc import ABC, ABCMeta, abstractmethod
 from datetime import date
 from typing import TYPE_CHECKING, Iterator, TypeVar
-from xml.etree import ElementTree as ET
 from xml.sax.saxutils import quoteattr
 
-from .common import xml_to_dict
+from .common import parse_xml, xml_to_dict
 from .session import session
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -15,6 +15,15 @@ if TYPE_CHECKING:  # pragma: no cover
 
 _T = TypeVar("_T")
 
+_COMMAND_TEMPLATE = "<request><command><subsystem>{subsystem}</subsystem><action>{action}</action><params>{params}</params></command></request>"
+_PARAM_TEMPLATE = "<param name={name}><![CDATA[{value}]]></param>"
+
+
+@functools.cache
+def _quoted_param_name(name: str) -> str:
+    """The parameter names are a small, fixed set: quote each of them only once."""
+    return quoteattr(name)
+
 
 class _SmartschoolXMLMeta(ABCMeta):
     """
@@ -32,16 +41,8 @@ class SmartschoolXML(ABC, metaclass=_SmartschoolXMLMeta):
     cache: dict  # Type hint for the dynamically added attribute
 
     def _construct_command(self) -> str:
-        txt = "<request><command>"
-        txt += f"<subsystem>{self._subsystem}</subsystem>"
-        txt += f"<action>{self._action}</action>"
-        txt += "<params>"
-
-        for k, v in self._params.items():
-            txt += f"<param name={quoteattr(k)}><![CDATA[{v}]]></param>"
-
-        txt += "</params></command></request>"
-        return txt
+        params = "".join(_PARAM_TEMPLATE.format(name=_quoted_param_name(k), value=v) for k, v in self._params.items())
+        return _COMMAND_TEMPLATE.format(subsystem=self._subsystem, action=self._action, params=params)
 
     def __iter__(self) -> Iterator[_T]:
         yield from self._xml()
@@ -86,7 +87,7 @@ class SmartschoolXML(ABC, metaclass=_SmartschoolXMLMeta):
             },
         )
 
-        root = ET.fromstring(response.text)
+        root = parse_xml(response.text)
 
         all_entries = []
         as_obj = self._object_to_instantiate
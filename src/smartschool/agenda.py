@@ -3,6 +3,7 @@ from __future__ import annotations
 import time
 from abc import ABC
 from datetime import datetime
+from typing import ClassVar
 
 from ._xml_interface import SmartschoolXML_WeeklyCache
 from .objects import AgendaHour, AgendaLesson, AgendaMomentInfo
@@ -51,6 +52,8 @@ class SmartschoolLessons(AgendaPoster):
     - someSubjectsEmpty
     """
 
+    _FIVE_DAYS_SEC: ClassVar[int] = 5 * 24 * 3600
+
     @property
     def _xpath(self) -> str:
         return ".//lesson"
@@ -70,7 +73,7 @@ class SmartschoolLessons(AgendaPoster):
     @property
     def _params(self) -> dict:
         now = (self.timestamp_to_use or datetime.now()).timestamp()
-        in_5_days = now + 5 * 24 * 3600
+        in_5_days = now + self._FIVE_DAYS_SEC
 
         return {
             "startDateTimestamp": now,  # 1700045313
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import atexit
 import contextlib
 import functools
+import importlib.util
 import inspect
 import json
 import operator
@@ -9,8 +11,8 @@ import platform
 import re
 import smtplib
 import sys
+import threading
 import traceback
-import warnings
 import xml.etree.ElementTree as ET
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -18,11 +20,24 @@ from enum import Enum, auto
 from pathlib import Path
 from typing import Any, Callable, Literal
 
-from bs4 import BeautifulSoup, FeatureNotFound, GuessedAtParserWarning
+from bs4 import BeautifulSoup
 from pydantic import RootModel
 from pydantic.dataclasses import is_pydantic_dataclass
 from requests import Response
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover
+    lxml_etree = None
+else:
+    if lxml_etree.LXML_VERSION < (5,):  # pragma: no cover  # Before 5.0, lxml loads external entities by default: stick to the stdlib.
+        lxml_etree = None
+
 __all__ = [
     "send_email",
     "capture_and_email_all_exceptions",
@@ -33,9 +48,58 @@ __all__ = [
     "make_filesystem_safe",
     "as_float",
     "xml_to_dict",
+    "parse_xml",
+    "json_dumps",
+    "json_loads",
 ]
 
-_used_bs4_option = None
+_smtp_connections: dict[int, smtplib.SMTP] = {}  # One per thread, keyed on `threading.get_ident()`
+_IS_WINDOWS = platform.system() == "Windows"
+
+# The XML is handed to us as an already decoded `str`, hence the encoding override.
+_LXML_PARSER = lxml_etree.XMLParser(encoding="utf-8", remove_comments=True, remove_pis=True) if lxml_etree is not None else None
+
+# Underscores are deliberately part of the run: this also collapses them together with the unsafe characters around them.
+_UNSAFE_FILESYSTEM_CHARS = re.compile("[^-a-z0-9.]+", flags=re.IGNORECASE)
+
+
+def json_dumps(data: Any) -> bytes:
+    """Serializes `data` to indented, UTF-8 encoded JSON, using `orjson` when it is installed."""
+    if orjson is None:
+        return json.dumps(data, indent=4).encode("utf8")
+
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Parses JSON, using `orjson` when it is installed."""
+    if orjson is None:
+        return json.loads(data)
+
+    return orjson.loads(data)
+
+
+@functools.cache
+def _root_model(cls: type) -> type[RootModel]:
+    """Parametrizing `RootModel` builds a whole schema: do that only once per class."""
+    return RootModel[cls]
+
+
+@functools.lru_cache(maxsize=1024)
+def _ensure_dir(directory: Path) -> None:
+    """Only hit the filesystem the first time we see a directory."""
+    directory.mkdir(exist_ok=True, parents=True)
+
+
+def _write_atomically(target: Path, data: bytes) -> None:
+    """Writes next to the target first, so a crash halfway through never leaves a truncated file behind."""
+    tmp = target.with_name(f"{target.name}.tmp")
+    try:
+        tmp.write_bytes(data)
+    except FileNotFoundError:  # `_ensure_dir` remembered the directory, but it was removed in the meanwhile.
+        target.parent.mkdir(exist_ok=True, parents=True)
+        tmp.write_bytes(data)
+    tmp.replace(target)
 
 
 class IsSaved(Enum):
@@ -48,34 +112,97 @@ def save(
     type_: Literal["agenda", "punten", "todo"], course_name: str, id_: str, data: dict | str | Any, is_eq: Callable = operator.eq, extension: str = "json"
 ) -> IsSaved | dict | str:
     save_as = Path.cwd() / f".cache/_{type_}/{course_name}/{id_}.{extension}"
-    save_as.parent.mkdir(exist_ok=True, parents=True)
+    _ensure_dir(save_as.parent)
+
     data_was_dict = isinstance(data, dict)
     data_was_object = is_pydantic_dataclass(data.__class__)
 
     if data_was_dict:
-        to_write = json.dumps(data, indent=4)
+        to_write = json_dumps(data)
     elif data_was_object:
-        to_write = RootModel[data.__class__](data).model_dump_json(indent=4)
+        to_write = _root_model(data.__class__)(data).model_dump_json(indent=4).encode("utf8")
     else:
-        to_write = data
+        to_write = data.encode("utf8")
 
-    if not save_as.exists():
-        save_as.write_text(to_write, encoding="utf8")
+    try:
+        old_data = save_as.read_bytes()
+    except FileNotFoundError:
+        _write_atomically(save_as, to_write)
         return IsSaved.NEW
 
-    old_data = save_as.read_text(encoding="utf8")
+    if old_data == to_write:  # Identical on disk: no need to parse & compare.
+        return IsSaved.SAME
+
     if data_was_dict or data_was_object:
-        old_data = json.loads(old_data)
+        old_data = json_loads(old_data)
+    else:
+        old_data = old_data.decode("utf8")
     if data_was_object:
         old_data = data.__class__(**old_data)
 
     if is_eq(data, old_data):
         return IsSaved.SAME
 
-    save_as.write_text(to_write, encoding="utf8")
+    _write_atomically(save_as, to_write)
     return old_data
 
 
+def _close_smtp(server: smtplib.SMTP) -> None:
+    with contextlib.suppress(smtplib.SMTPException, OSError):
+        server.quit()
+
+
+@atexit.register
+def _close_all_smtp() -> None:
+    while _smtp_connections:
+        _close_smtp(_smtp_connections.popitem()[1])
+
+
+def _is_alive(server: smtplib.SMTP) -> bool:
+    if server.sock is None:  # smtplib closed it after an error
+        return False
+
+    try:
+        return server.noop()[0] == 250
+    except (smtplib.SMTPException, OSError):
+        return False
+
+
+def _get_smtp(*, reconnect: bool = False) -> smtplib.SMTP:
+    """One SMTP connection per thread, so consecutive emails don't redo the connect & EHLO handshake."""
+    thread_id = threading.get_ident()
+    server = _smtp_connections.get(thread_id)
+    if server is not None and (reconnect or not _is_alive(server)):
+        _close_smtp(server)
+        server = None
+
+    if server is None:
+        server = _smtp_connections[thread_id] = smtplib.SMTP("localhost")
+
+    return server
+
+
+def _as_plain_email(subject: str, text: str, email_to: list[str], email_from: str) -> str | None:
+    """
+    Formats the email by hand when it doesn't need any encoding.
+
+    That's the case when it's pure ASCII, no header contains a line break, and no line exceeds the RFC 5322 limit of 998 characters.
+    Returns `None` when the email has to go through the `email.mime` machinery instead.
+    """
+    headers = {"Subject": subject, "From": email_from, "To": ", ".join(email_to)}
+    if any("\r" in value or "\n" in value for value in headers.values()):
+        return None
+
+    msg = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    msg += 'MIME-Version: 1.0\r\nContent-Type: text/plain; charset="us-ascii"\r\nContent-Transfer-Encoding: 7bit\r\n\r\n'
+    msg += text
+
+    if not msg.isascii() or any(len(line) > 998 for line in msg.splitlines()):
+        return None
+
+    return msg
+
+
 def send_email(
     subject: str,
     text: str,
@@ -85,15 +212,9 @@ def send_email(
     if isinstance(email_to, str):
         email_to = [email_to]
 
-    message = MIMEMultipart("alternative")
-    message["Subject"] = subject
-    message["From"] = email_from
-    message["To"] = ", ".join(email_to)
-    message.attach(MIMEText(text, "plain", "utf8"))
-
     print(f"Sending email >> {subject}")
 
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         print("=================== On Linux we would have sent this: ===================")
         print(f"Subject: {subject}")
         print("")
@@ -101,12 +222,24 @@ def send_email(
         print("=========================================================================")
         return
 
-    with smtplib.SMTP("localhost") as server:
-        server.sendmail(
-            from_addr=email_from,
-            to_addrs=email_to,
-            msg=message.as_string(),
-        )
+    msg = _as_plain_email(subject, text, email_to, email_from)
+    if msg is None:
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = email_from
+        message["To"] = ", ".join(email_to)
+        message.attach(MIMEText(text, "plain", "utf8"))
+        msg = message.as_string()
+
+    # A disconnect while sending isn't retried: it might come after the server accepted the message, which would send it twice.
+    try:
+        _get_smtp().sendmail(from_addr=email_from, to_addrs=email_to, msg=msg)
+    except smtplib.SMTPSenderRefused as ex:
+        if ex.smtp_code != 421:
+            raise
+
+        # 421 on MAIL FROM: the server timed out our idle session between the ping and now. Nothing was accepted yet, so retry once.
+        _get_smtp(reconnect=True).sendmail(from_addr=email_from, to_addrs=email_to, msg=msg)
 
 
 def capture_and_email_all_exceptions(
@@ -142,32 +275,23 @@ def capture_and_email_all_exceptions(
     return decorator
 
 
-def bs4_html(html: str | bytes | Response) -> BeautifulSoup:
-    global _used_bs4_option
+def _detect_bs4_features() -> str:
+    """Picks the fastest parser that is installed."""
+    if lxml_etree is not None:
+        return "lxml"
+    if importlib.util.find_spec("html5lib") is not None:
+        return "html5lib"
+    return "html.parser"
 
-    if isinstance(html, Response):
-        html = html.text
 
-    possible_options = [
-        _used_bs4_option,
-        {"parser": "html.parser", "features": "lxml"},
-        {"features": "html5lib"},
-        {"features": "html.parser"},
-    ]
+_BS4_FEATURES = _detect_bs4_features()
 
-    for kw in possible_options:  # pragma: no branch
-        if kw is None:
-            continue
 
-        with contextlib.suppress(FeatureNotFound):
-            parsed = BeautifulSoup(html, **kw)
-            _used_bs4_option = kw
-            return parsed
+def bs4_html(html: str | bytes | Response) -> BeautifulSoup:
+    if isinstance(html, Response):
+        html = html.text
 
-    _used_bs4_option = {}
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", category=GuessedAtParserWarning)
-        return BeautifulSoup(html)
+    return BeautifulSoup(html, features=_BS4_FEATURES)
 
 
 def get_all_values_from_form(html, form_selector):
@@ -177,69 +301,66 @@ def get_all_values_from_form(html, form_selector):
 
     # action = form.attrs.get("action").lower()
     # method = form.attrs.get("method", "get").lower()
-    all_inputs = form.find_all(["input", "button", "textarea", "select"])
-
-    inputs = []
-    for input_tag in all_inputs:
-        tag_name = input_tag.name.lower()
-        attrs = input_tag.attrs
+    # Only named fields are submitted: let bs4 skip the others while it is searching.
+    all_inputs = form.find_all(["input", "button", "textarea", "select"], attrs={"name": True})
 
-        if "name" not in attrs:
-            continue
+    # <select> isn't supported (the login form has none): its value would be the selected <option>, or else the first one.
+    assert all(input_tag.name != "select" for input_tag in all_inputs), (
+        "Check if this code works. Possible issue with getting the value if the value tag isn't set"
+    )
 
-        assert tag_name != "select", "Check if this code works. Possible issue with getting the value if the value tag isn't set"
-        inputs.append(
-            {
-                "name": attrs.get("name"),
-                "value": attrs.get("value", ""),
-            }
-        )
-        #     select_options = []
-        #     value = ""
-        #     for select_option in input_tag.find_all("option"):
-        #         option_value = select_option.attrs.get("value")
-        #         if option_value:
-        #             select_options.append(option_value)
-        #             if "selected" in select_option.attrs:
-        #                 value = option_value
-        #     if not value and select_options:
-        #         # if the default is not set, and there are options, take the first option as default
-        #         value = select_options[0]
-        #     # add the select to the inputs list
-        #     inputs.append({"name": attrs.get("name"), "values": select_options, "value": value})
-
-    return inputs
+    return [{"name": input_tag["name"], "value": input_tag.get("value", "")} for input_tag in all_inputs]
 
 
 def make_filesystem_safe(name: str) -> str:
-    name = re.sub("[^-_a-z0-9.]+", "_", name, flags=re.IGNORECASE)
-    name = re.sub("_{2,}", "_", name)
-    return name
+    return _UNSAFE_FILESYSTEM_CHARS.sub("_", name)
 
 
 def as_float(txt: str) -> float:
     return float(txt.replace(",", "."))
 
 
+def parse_xml(xml: str):
+    """Parses an XML document with `lxml` when it is installed, or with the standard library otherwise."""
+    xml = xml.strip()
+    if lxml_etree is None:
+        return ET.XML(xml)
+
+    return lxml_etree.fromstring(xml.encode("utf8"), parser=_LXML_PARSER)
+
+
 def xml_to_dict(element, *, depth: int = 0):
     if depth == 0 and isinstance(element, str):
-        element = ET.XML(element.strip())
+        element = parse_xml(element)
 
     result = {}
 
-    for child in element:
-        tag = child.tag
-        if len(child) == 0:  # Leaf node?
-            child_data = child.text
-        else:
-            child_data = xml_to_dict(child)
-
-        if tag in result:
-            if not isinstance(result[tag], list):
-                # If the tag already exists, convert it to a list
-                result[tag] = [result[tag]]
-            result[tag].append(child_data)
-        else:
-            result[tag] = child_data
+    # Walk the tree with an explicit stack instead of recursing: (element, dict to fill in)
+    todo = [(element, result)]
+    while todo:
+        element, target = todo.pop()
+
+        # Tag names repeat across every record: intern them so all dicts share the same key objects.
+        tags = [sys.intern(child.tag) for child in element]
+
+        # Most elements are flat records: only leaves, and every tag occurs once.
+        if len(set(tags)) == len(tags) and all(len(child) == 0 for child in element):
+            target.update(zip(tags, (child.text for child in element), strict=True))
+            continue
+
+        for tag, child in zip(tags, element, strict=True):
+            if len(child) == 0:  # Leaf node?
+                child_data = child.text
+            else:
+                child_data = {}
+                todo.append((child, child_data))
+
+            if tag in target:
+                if not isinstance(target[tag], list):
+                    # If the tag already exists, convert it to a list
+                    target[tag] = [target[tag]]
+                target[tag].append(child_data)
+            else:
+                target[tag] = child_data
 
     return result
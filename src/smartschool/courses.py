@@ -1,14 +1,61 @@
 from __future__ import annotations
 
-from functools import cached_property
-from typing import Iterator
+import contextlib
+import os
+import time
+from pathlib import Path
+from typing import Any, ClassVar, Iterator
 
+from pydantic import TypeAdapter
+
+from .common import _ensure_dir, _write_atomically, json_dumps, json_loads, make_filesystem_safe
 from .objects import Course, CourseCondensed
 from .session import session
 
 __all__ = ["Courses", "TopNavCourses"]
 
 
+# Only applies to the copy on disk: once a list is loaded, it is kept in memory until `refresh()` or the end of the process.
+COURSES_CACHE_TTL = 24 * 3600
+
+_COURSES_CONDENSED = TypeAdapter(list[CourseCondensed])
+_COURSES = TypeAdapter(list[Course])
+
+
+def _session_key() -> tuple[str, str]:
+    """The course lists only change per account, so that's what we cache them on."""
+    if session.creds is None:
+        raise RuntimeError("Please start smartschool first via: `Smartschool.start(PathCredentials())`")
+
+    return session.creds.main_url, session.creds.username
+
+
+def _cache_file(url: str) -> Path:
+    account = make_filesystem_safe("_".join(_session_key()))
+    return Path.cwd() / ".cache" / "_courses" / account / f"{make_filesystem_safe(url)}.json"
+
+
+def _fetch_json(url: str, **kwargs) -> Any:
+    """
+    The course lists hardly change during a school year, so they're kept on disk for a while.
+
+    `SMARTSCHOOL_COURSES_CACHE_TTL` overrides how long (in seconds), `0` disables this cache.
+    """
+    ttl = int(os.getenv("SMARTSCHOOL_COURSES_CACHE_TTL", COURSES_CACHE_TTL))
+    if ttl <= 0:
+        return session.json(url, **kwargs)
+
+    cache_file = _cache_file(url)
+    with contextlib.suppress(FileNotFoundError, ValueError):  # A corrupt file is just a cache miss
+        if cache_file.stat().st_mtime > time.time() - ttl:
+            return json_loads(cache_file.read_bytes())
+
+    json = session.json(url, **kwargs)
+    _ensure_dir(cache_file.parent)
+    _write_atomically(cache_file, json_dumps(json))
+    return json
+
+
 class TopNavCourses:
     """
     Retrieves a list of the courses which are available from the top navigation bar.
@@ -24,9 +71,21 @@ class TopNavCourses:
 
     """
 
-    @cached_property
+    cache: ClassVar[dict] = {}
+    _url: ClassVar[str] = "/Topnav/getCourseConfig"
+
+    @property
     def _list(self) -> list[CourseCondensed]:
-        return [CourseCondensed(**course) for course in session.json("/Topnav/getCourseConfig", method="post")["own"]]
+        key = _session_key()
+        if key not in self.cache:
+            self.cache[key] = _COURSES_CONDENSED.validate_python(_fetch_json(self._url, method="post")["own"])
+
+        return self.cache[key]
+
+    def refresh(self) -> None:
+        """Forgets the cached list (in memory and on disk), so the next iteration fetches it from smartschool again."""
+        self.cache.pop(_session_key(), None)
+        _cache_file(self._url).unlink(missing_ok=True)
 
     def __iter__(self) -> Iterator[CourseCondensed]:
         yield from self._list
@@ -49,9 +108,21 @@ class Courses:
 
     """
 
-    @cached_property
+    cache: ClassVar[dict] = {}
+    _url: ClassVar[str] = "/results/api/v1/courses/"
+
+    @property
     def _list(self) -> list[Course]:
-        return [Course(**course) for course in session.json("/results/api/v1/courses/")]
+        key = _session_key()
+        if key not in self.cache:
+            self.cache[key] = _COURSES.validate_python(_fetch_json(self._url))
+
+        return self.cache[key]
+
+    def refresh(self) -> None:
+        """Forgets the cached list (in memory and on disk), so the next iteration fetches it from smartschool again."""
+        self.cache.pop(_session_key(), None)
+        _cache_file(self._url).unlink(missing_ok=True)
 
     def __iter__(self) -> Iterator[Course]:
         yield from self._list
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import functools
 import os
 from abc import ABC
 from dataclasses import dataclass, field
 from pathlib import Path
 
-import yaml
+
+@functools.cache
+def _yaml_loader() -> type:
+    """Only pay for importing `yaml` when a credentials file is actually read."""
+    try:
+        from yaml import CSafeLoader as loader
+    except ImportError:  # pragma: no cover  # PyYAML was built without libyaml
+        from yaml import SafeLoader as loader
+
+    return loader
 
 
 class Credentials(ABC):
@@ -34,12 +44,14 @@ class Credentials(ABC):
 
 @dataclass
 class PathCredentials(Credentials):
-    filename: str | Path = field(default=Path.cwd().joinpath("credentials.yml"))
+    filename: str | Path = field(default_factory=lambda: Path.cwd() / "credentials.yml")
 
     def __post_init__(self):
         self.filename = Path(self.filename)
 
-        cred_file: dict = yaml.safe_load(self.filename.read_text(encoding="utf8"))
+        import yaml
+
+        cred_file: dict = yaml.load(self.filename.read_bytes(), Loader=_yaml_loader())
         self.username = cred_file.pop("username", None)
         self.password = cred_file.pop("password", None)
         self.main_url = cred_file.pop("main_url", None)
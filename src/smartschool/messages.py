@@ -271,22 +271,21 @@ class MessageMoveToArchive:
             msg_id = [msg_id]
 
         self.msg_ids = msg_id
+        self._body = "&".join("msgIDs%5B%5D=" + quote_plus(str(msg_id)) for msg_id in self.msg_ids)
 
     def get(self) -> MessageChanged:
         return next(iter(self))
 
     def __iter__(self) -> Iterator[MessageChanged]:
-        construction = "&".join("msgIDs%5B%5D=" + quote_plus(str(msg_id)) for msg_id in self.msg_ids)
-
         resp = session.post(
             "/Messages/Xhr/archivemessages",
-            data=construction,
+            data=self._body,
             headers={
                 "X-Requested-With": "XMLHttpRequest",
             },
         )
 
-        success = resp.json()["success"]
+        success = set(resp.json()["success"])
         for msg_id in self.msg_ids:
             yield MessageChanged(id=msg_id, new=1 if msg_id in success else 0)
 
@@ -1,46 +1,77 @@
 from __future__ import annotations
 
 import base64
+import contextlib
 from datetime import date, datetime
-from functools import cached_property
-from typing import Annotated, Literal
+from functools import cache, cached_property, lru_cache
+from typing import TYPE_CHECKING, Annotated, Literal
 
-from pydantic import AliasChoices, BeforeValidator, constr
+from pydantic import AliasChoices, BeforeValidator, StringConstraints, TypeAdapter
 from pydantic.dataclasses import Field, dataclass
 
 from .common import as_float
 from .session import session
 
-String = constr(strip_whitespace=True)
+if TYPE_CHECKING:  # pragma: no cover
+    from .agenda import SmartschoolHours
 
+String = Annotated[str, StringConstraints(strip_whitespace=True)]
 
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _has_server_datetime_shape(x: str) -> bool:
+    """Either "YYYY-MM-DD HH:MM", or "YYYY-MM-DDTHH:MM:SS" followed by "Z", "+HHMM" or "+HH:MM"."""
+    if len(x) < 16 or x[4] != "-" or x[7] != "-" or x[13] != ":":
+        return False
+    if len(x) == 16:
+        return x[10] == " "
+    return len(x) in (20, 24, 25) and x[10] == "T" and x[16] == ":" and x[19] in "+-Z"
+
+
+@lru_cache(maxsize=128)
 def convert_to_datetime(x: str | String | datetime) -> datetime:
     if isinstance(x, datetime):
         if x.tzinfo is None:
             raise ValueError("No timezone information found in this date")
         return x
 
+    # The C-implemented ISO parser covers both formats the server sends ("2023-11-16T08:24:00+01:00" and "2023-11-16 08:24").
+    # It accepts a lot more than that though (week dates, no seconds, fractions, ...): anything else goes through the strict formats below.
+    if _has_server_datetime_shape(x):
+        with contextlib.suppress(ValueError):
+            return datetime.fromisoformat(x)
+
     try:
         return datetime.strptime(x, "%Y-%m-%dT%H:%M:%S%z")
     except ValueError:  # 2023-11-16 08:24
         return datetime.strptime(x, "%Y-%m-%d %H:%M")
 
 
+@lru_cache(maxsize=128)
 def convert_to_date(x: str | String | date | datetime) -> date:
     if isinstance(x, datetime):
         return x.date()
     if isinstance(x, date):
         return x
 
+    if len(x) == 10 and x[4] == x[7] == "-":  # Only "YYYY-MM-DD": `fromisoformat` also accepts "YYYYMMDD" and week dates.
+        with contextlib.suppress(ValueError):
+            return date.fromisoformat(x)
+
     return datetime.strptime(x, "%Y-%m-%d").date()
 
 
-Url = Annotated[str | String, BeforeValidator(lambda x: session.create_url(x))]
+def _create_url(x: str) -> str:
+    return session.create_url(x)
+
+
+Url = Annotated[str | String, BeforeValidator(_create_url)]
 Date = Annotated[date, BeforeValidator(convert_to_date)]
 DateTime = Annotated[datetime, BeforeValidator(convert_to_datetime)]
 
 
-@dataclass
+@dataclass(slots=True)
 class CourseGraphic:
     type: Literal["icon"]
     value: String
@@ -54,25 +85,31 @@ class ResultGraphic:
     description: String
 
     @cached_property
+    def _points(self) -> tuple[float, float]:
+        parts = self.description.split("/")
+        return as_float(parts[0]), as_float(parts[1])
+
+    @property
     def achieved_points(self) -> float:
-        return as_float(self.description.split("/")[0])
+        return self._points[0]
 
-    @cached_property
+    @property
     def total_points(self) -> float:
-        return as_float(self.description.split("/")[1])
+        return self._points[1]
 
     @property
     def percentage(self) -> float:
-        return self.achieved_points / self.total_points
+        achieved, total = self._points
+        return achieved / total
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonDescription:
     startingWithFirstName: String = ""
     startingWithLastName: String = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class _User:
     id: String
     pictureHash: String
@@ -82,19 +119,19 @@ class _User:
     sort: String
 
 
-@dataclass
+@dataclass(slots=True)
 class DateRange:
     start: DateTime
     end: DateTime
 
 
-@dataclass
+@dataclass(slots=True)
 class SkoreWorkYear:
     id: int
     dateRange: DateRange
 
 
-@dataclass
+@dataclass(slots=True)
 class Class_:
     identifier: String
     id: int
@@ -104,7 +141,7 @@ class Class_:
     icon: String
 
 
-@dataclass
+@dataclass(slots=True)
 class Period:
     id: int
     name: String
@@ -114,7 +151,7 @@ class Period:
     class_: Class_ = Field(validation_alias=AliasChoices("class", "class_"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Component:
     id: int
     name: String
@@ -125,7 +162,7 @@ Teacher = _User
 Student = _User
 
 
-@dataclass
+@dataclass(slots=True)
 class Course:
     id: int
     name: String
@@ -137,13 +174,13 @@ class Course:
     class_: Class_ = Field(validation_alias=AliasChoices("class", "class_"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Feedback:
     text: String
     user: Teacher
 
 
-@dataclass
+@dataclass(slots=True)
 class FeedbackFull:
     attachments: list[String]
     changedAt: DateTime
@@ -155,7 +192,7 @@ class FeedbackFull:
     text: String
 
 
-@dataclass
+@dataclass(slots=True)
 class Result:
     identifier: String
     type: Literal["normal"]
@@ -174,7 +211,7 @@ class Result:
     doesCount: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class ResultDetails:
     centralTendencies: list[String]
     teachers: list[Teacher]
@@ -183,12 +220,12 @@ class ResultDetails:
     class_: Class_ = Field(validation_alias=AliasChoices("class", "class_"))
 
 
-@dataclass
+@dataclass(slots=True)
 class ResultWithDetails(Result):
     details: ResultDetails
 
 
-@dataclass
+@dataclass(slots=True)
 class CourseCondensed:
     name: String
     teacher: String
@@ -198,7 +235,7 @@ class CourseCondensed:
     icon: String = Field(repr=False, default="")
 
 
-@dataclass
+@dataclass(slots=True)
 class FutureTaskOneTask:
     label: String
     description: String
@@ -219,13 +256,13 @@ class FutureTaskOneTask:
     hourID: String
 
 
-@dataclass
+@dataclass(slots=True)
 class FutureTaskOneItem:
     tasks: list[FutureTaskOneTask]
     materials: list[String]
 
 
-@dataclass
+@dataclass(slots=True)
 class FutureTaskOneCourse:
     lessonID: String
     hourID: String
@@ -234,14 +271,17 @@ class FutureTaskOneCourse:
     items: FutureTaskOneItem
 
 
-@dataclass
+@dataclass(slots=True)
 class FutureTaskOneDay:
     date: Date
     pretty_date: String
     courses: list[FutureTaskOneCourse]
 
 
-@dataclass
+_FUTURE_TASK_DAYS = TypeAdapter(list[FutureTaskOneDay])
+
+
+@dataclass(slots=True)
 class FutureTasks:
     """
     Class that interfaces the retrieval of any task that needs to be made in the near future.
@@ -278,15 +318,13 @@ class FutureTasks:
             },
         )
 
-        self.days = []
-        for d in json["days"]:
-            self.days.append(FutureTaskOneDay(**d))
+        self.days = _FUTURE_TASK_DAYS.validate_python(json["days"])
 
         self.last_assignment_id = json["last_assignment_id"]
         self.last_date = convert_to_date(json["last_date"])
 
 
-@dataclass
+@dataclass(slots=True)
 class AgendaHour:
     hourID: String
     start: String
@@ -294,7 +332,15 @@ class AgendaHour:
     title: String
 
 
-@dataclass
+@cache
+def _smartschool_hours() -> SmartschoolHours:
+    """The hours themselves are cached on the class, so one instance can serve every lesson."""
+    from .agenda import SmartschoolHours
+
+    return SmartschoolHours()
+
+
+@dataclass(slots=True)
 class AgendaLesson:
     momentID: String
     lessonID: String
@@ -327,12 +373,10 @@ class AgendaLesson:
 
     @property
     def hour_details(self) -> AgendaHour:
-        from .agenda import SmartschoolHours
-
-        return SmartschoolHours().search_by_hourId(self.hourID)
+        return _smartschool_hours().search_by_hourId(self.hourID)
 
 
-@dataclass
+@dataclass(slots=True)
 class AgendaMomentInfoAssignment:
     startAssignment: String
     start: String
@@ -346,7 +390,7 @@ class AgendaMomentInfoAssignment:
     assignmentDeadline: String
 
 
-@dataclass
+@dataclass(slots=True)
 class AgendaMomentInfo:
     className: String
     subject: String
@@ -355,7 +399,7 @@ class AgendaMomentInfo:
     assignments: list[AgendaMomentInfoAssignment]
 
 
-@dataclass
+@dataclass(slots=True)
 class StudentSupportLink:
     id: String
     name: String
@@ -366,7 +410,7 @@ class StudentSupportLink:
     isVisible: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class ShortMessage:
     id: int
     fromImage: Url
@@ -386,7 +430,7 @@ class ShortMessage:
     from_: String = Field(validation_alias=AliasChoices("from", "from_"))
 
 
-@dataclass
+@dataclass(slots=True)
 class FullMessage:
     id: int
     to: String | None
@@ -413,7 +457,7 @@ class FullMessage:
     from_: String = Field(validation_alias=AliasChoices("from", "from_"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Attachment:
     fileID: int
     name: String
@@ -424,17 +468,27 @@ class Attachment:
     order: int
 
     def download(self) -> bytes:
-        resp = session.get(f"/?module=Messages&file=download&fileID={self.fileID}&target=0")
-        return base64.b64decode(resp.content)
+        """Decodes the base64 payload while it streams in, so the encoded body is never held in memory as a whole."""
+        decoded = []
+        pending = b""
+        with session.get(f"/?module=Messages&file=download&fileID={self.fileID}&target=0", stream=True) as resp:
+            for chunk in resp.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                pending += chunk.translate(None, b" \t\r\n")
+                usable = len(pending) - len(pending) % 4  # base64 decodes in groups of 4 characters
+                decoded.append(base64.b64decode(pending[:usable]))
+                pending = pending[usable:]
 
+        decoded.append(base64.b64decode(pending))
+        return b"".join(decoded)
 
-@dataclass
+
+@dataclass(slots=True)
 class MessageChanged:
     id: int
     new: int = Field(validation_alias=AliasChoices("status", "label", "new"))
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageDeletionStatus:
     msgID: int
     boxType: String
@@ -1,10 +1,14 @@
 from typing import Iterator
 
+from pydantic import TypeAdapter
+
 from .objects import Period
 from .session import session
 
 __all__ = ["Periods"]
 
+_PERIODS = TypeAdapter(list[Period])
+
 
 class Periods:
     """
@@ -22,5 +26,4 @@ class Periods:
     """
 
     def __iter__(self) -> Iterator[Period]:
-        for period in session.json("/results/api/v1/periods/"):
-            yield Period(**period)
+        yield from _PERIODS.validate_python(session.json("/results/api/v1/periods/"))
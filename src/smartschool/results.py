@@ -1,6 +1,8 @@
 from itertools import count
 from typing import Iterator
 
+from pydantic import TypeAdapter
+
 from .exceptions import DownloadError
 from .objects import Result, ResultWithDetails
 from .session import session
@@ -10,6 +12,8 @@ __all__ = ["Results", "ResultDetail"]
 
 RESULTS_PER_PAGE = 50
 
+_RESULTS = TypeAdapter(list[Result])
+
 
 class Results:
     """
@@ -32,8 +36,7 @@ class Results:
                 raise DownloadError("No JSON was returned for the results?!")
 
             json = downloaded_webpage.json()
-            for result in json:
-                yield Result(**result)
+            yield from _RESULTS.validate_python(json)
 
             if len(json) < RESULTS_PER_PAGE:
                 break
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import contextlib
 import functools
-import json
 import time
 from dataclasses import dataclass, field
 from functools import cached_property
@@ -12,8 +11,9 @@ from typing import TYPE_CHECKING, Self
 from urllib.parse import urljoin
 
 from requests import Session
+from requests.adapters import HTTPAdapter
 
-from .common import bs4_html, get_all_values_from_form
+from .common import bs4_html, get_all_values_from_form, json_loads
 
 if TYPE_CHECKING:  # pragma: no cover
     from requests import Response
@@ -75,6 +75,11 @@ class Smartschool:
     def __post_init__(self):
         self._session.headers["User-Agent"] = "unofficial Smartschool API interface"
 
+        # Keep connections alive & pooled, so consecutive requests (& concurrent downloads) skip the TCP/TLS handshake.
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=3)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
         cookie_jar = LWPCookieJar(self.cookie_file)
         with contextlib.suppress(FileNotFoundError):
             cookie_jar.load(ignore_discard=True)
@@ -99,10 +104,10 @@ class Smartschool:
         else:
             r = self.get(url, *args, **kwargs)
 
-        json_ = r.text
+        json_ = r.content  # Bytes: `json_loads` decodes them itself, no need to go through `r.text` first.
 
-        while isinstance(json_, str):
-            json_ = json.loads(json_)
+        while isinstance(json_, str | bytes):
+            json_ = json_loads(json_)
 
         return json_
 
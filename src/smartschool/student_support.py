@@ -1,10 +1,14 @@
 from typing import Iterator
 
+from pydantic import TypeAdapter
+
 from .objects import StudentSupportLink
 from .session import session
 
 __all__ = ["StudentSupportLinks"]
 
+_STUDENT_SUPPORT_LINKS = TypeAdapter(list[StudentSupportLink])
+
 
 class StudentSupportLinks:
     """
@@ -23,5 +27,4 @@ class StudentSupportLinks:
 
     def __iter__(self) -> Iterator[StudentSupportLink]:
         json = session.json("/student-support/api/v1/")
-        for result in json:
-            yield StudentSupportLink(**result)
+        yield from _STUDENT_SUPPORT_LINKS.validate_python(json)
@@ -1,17 +1,29 @@
 import contextlib
-import warnings
+import shutil
+import smtplib
 from copy import deepcopy
+from email.errors import HeaderParseError
 from io import StringIO
 from pathlib import Path
 
 import pytest
-from bs4 import BeautifulSoup, FeatureNotFound, GuessedAtParserWarning
-from smartschool.common import IsSaved, as_float, bs4_html, capture_and_email_all_exceptions, make_filesystem_safe, save, send_email, xml_to_dict
+from bs4 import BeautifulSoup
+from smartschool.common import (
+    IsSaved,
+    _close_all_smtp,
+    _detect_bs4_features,
+    as_float,
+    bs4_html,
+    capture_and_email_all_exceptions,
+    make_filesystem_safe,
+    save,
+    send_email,
+    xml_to_dict,
+)
 from smartschool.objects import Student
 
 
-def test_xml_to_dict():
-    xml = """
+_NESTED_XML = """
 <?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <server>
   <response>
@@ -24,18 +36,57 @@ def test_xml_to_dict():
   </response>
 </server>
 """
-    assert xml_to_dict(xml) == {
-        "response": {
-            "actions": {
-                "sub": [
-                    "123",
-                    "456",
-                    {"extra": None},
-                ],
-            },
-            "status": "ok",
+
+
+_NESTED_DICT = {
+    "response": {
+        "actions": {
+            "sub": [
+                "123",
+                "456",
+                {"extra": None},
+            ],
         },
-    }
+        "status": "ok",
+    },
+}
+
+
+def test_xml_to_dict():
+    assert xml_to_dict(_NESTED_XML) == _NESTED_DICT
+
+
+def test_xml_to_dict_without_lxml(mocker):
+    mocker.patch("smartschool.common.lxml_etree", new=None)
+
+    assert xml_to_dict(_NESTED_XML) == _NESTED_DICT
+
+
+@pytest.mark.parametrize("use_lxml", [True, False])
+def test_xml_to_dict_honours_declared_encoding(mocker, use_lxml):
+    if not use_lxml:
+        mocker.patch("smartschool.common.lxml_etree", new=None)
+
+    assert xml_to_dict('<?xml version="1.0" encoding="ISO-8859-1"?><r><a>é</a></r>') == {"a": "é"}
+
+
+@pytest.mark.parametrize("use_lxml", [True, False])
+def test_xml_to_dict_does_not_load_external_entities(tmp_path, mocker, use_lxml):
+    if not use_lxml:
+        mocker.patch("smartschool.common.lxml_etree", new=None)
+
+    secret = tmp_path / "secret.txt"
+    secret.write_text("secret")
+    xml = f'<?xml version="1.0"?><!DOCTYPE r [<!ENTITY x SYSTEM "{secret.as_uri()}">]><r><a>&x;</a></r>'
+
+    with pytest.raises(SyntaxError, match=r"(?i)entity"):
+        xml_to_dict(xml)
+
+
+def test_xml_to_dict_flat_record():
+    xml = "<lesson><momentID>123</momentID><hourID>456</hourID><note/></lesson>"
+
+    assert xml_to_dict(xml) == {"momentID": "123", "hourID": "456", "note": None}
 
 
 def test_save(tmp_path: Path) -> None:
@@ -47,6 +98,24 @@ def test_save(tmp_path: Path) -> None:
     assert save(type_="todo", course_name="test", id_="456", data={"Test": 456}) == IsSaved.SAME
     assert save(type_="todo", course_name="test", id_="456", data={"Test": 789}) == {"Test": 456}
 
+    assert save(type_="todo", course_name="test", id_="456", data={"Test": 123}, is_eq=lambda a, b: True) == IsSaved.SAME
+
+
+def test_save_after_cache_dir_was_removed(tmp_path: Path) -> None:
+    assert save(type_="todo", course_name="test", id_="123", data="Test") == IsSaved.NEW
+
+    shutil.rmtree(tmp_path / ".cache")
+
+    assert save(type_="todo", course_name="test", id_="123", data="Test") == IsSaved.NEW
+
+
+def test_save_without_orjson(tmp_path: Path, mocker) -> None:
+    mocker.patch("smartschool.common.orjson", new=None)
+
+    assert save(type_="todo", course_name="test", id_="456", data={"Test": 456}) == IsSaved.NEW
+    assert save(type_="todo", course_name="test", id_="456", data={"Test": 456}) == IsSaved.SAME
+    assert save(type_="todo", course_name="test", id_="456", data={"Test": 789}) == {"Test": 456}
+
 
 def test_save_as_pydantic_dataclass(tmp_path: Path) -> None:
     sut = Student(
@@ -67,22 +136,120 @@ def test_save_as_pydantic_dataclass(tmp_path: Path) -> None:
 
 
 def test_send_email(mocker):
-    mocker.patch("platform.system", return_value="Linux")
+    mocker.patch("smartschool.common._IS_WINDOWS", new=False)
+    mocker.patch.dict("smartschool.common._smtp_connections", clear=True)
     server = mocker.patch("smtplib.SMTP")
 
     send_email(subject="Test", text="Just a test", email_to="me@myself.ai", email_from="me@myself.ai")
 
-    server.assert_any_call("localhost")
+    server.assert_called_once_with("localhost")
 
-    sendmail_call = server().__enter__().sendmail
+    sendmail_call = server.return_value.sendmail
     assert sendmail_call.call_args.kwargs["from_addr"] == "me@myself.ai"
     assert sendmail_call.call_args.kwargs["to_addrs"] == ["me@myself.ai"]
-    assert sendmail_call.call_args.kwargs["msg"].startswith("Content-Type: multipart/alternative; boundary")
-    assert "Subject: Test" in sendmail_call.call_args.kwargs["msg"]
+    assert sendmail_call.call_args.kwargs["msg"].startswith("Subject: Test\r\n")
+    assert sendmail_call.call_args.kwargs["msg"].endswith("\r\n\r\nJust a test")
+
+
+@pytest.mark.parametrize(
+    ("subject", "text"),
+    [
+        ("[⚠Smartschool parser⚠] Test", "Just a test"),
+        ("Test", "Just a tést"),
+        ("Test", "x" * 1000),
+    ],
+)
+def test_send_email_needing_mime(mocker, subject, text):
+    mocker.patch("smartschool.common._IS_WINDOWS", new=False)
+    mocker.patch.dict("smartschool.common._smtp_connections", clear=True)
+    server = mocker.patch("smtplib.SMTP")
+
+    with contextlib.redirect_stdout(StringIO()):
+        send_email(subject=subject, text=text, email_to="me@myself.ai", email_from="me@myself.ai")
+
+    assert server.return_value.sendmail.call_args.kwargs["msg"].startswith("Content-Type: multipart/alternative; boundary")
+
+
+def _send_test_email():
+    send_email(subject="Test", text="Just a test", email_to="me@myself.ai", email_from="me@myself.ai")
+
+
+@pytest.fixture
+def smtp_server(mocker):
+    mocker.patch("smartschool.common._IS_WINDOWS", new=False)
+    mocker.patch.dict("smartschool.common._smtp_connections", clear=True)
+    server = mocker.patch("smtplib.SMTP")
+    server.return_value.noop.return_value = (250, b"OK")
+    return server
+
+
+def test_send_email_reuses_the_connection(smtp_server):
+    _send_test_email()
+    _send_test_email()
+
+    assert smtp_server.call_count == 1
+    smtp_server.return_value.noop.assert_called_once()  # Checked before it was reused
+    assert smtp_server.return_value.sendmail.call_count == 2
+
+    _close_all_smtp()
+    smtp_server.return_value.quit.assert_called_once()
+
+
+@pytest.mark.parametrize("noop", [smtplib.SMTPServerDisconnected, (421, b"4.4.2 timeout exceeded")])
+def test_send_email_replaces_a_dead_connection(smtp_server, noop):
+    _send_test_email()
+
+    if isinstance(noop, tuple):
+        smtp_server.return_value.noop.return_value = noop
+    else:
+        smtp_server.return_value.noop.side_effect = noop
+    _send_test_email()
+
+    assert smtp_server.call_count == 2
+    smtp_server.return_value.quit.assert_called_once()  # The dead connection is closed
+    assert smtp_server.return_value.sendmail.call_count == 2
+
+
+def test_send_email_reconnects_after_an_idle_timeout(smtp_server):
+    smtp_server.return_value.sendmail.side_effect = [smtplib.SMTPSenderRefused(421, b"4.4.2 timeout exceeded", "me@myself.ai"), None]
+
+    _send_test_email()
+
+    assert smtp_server.call_count == 2
+    assert smtp_server.return_value.sendmail.call_count == 2
+
+
+def test_send_email_does_not_resend_after_a_disconnect(smtp_server):
+    smtp_server.return_value.sendmail.side_effect = smtplib.SMTPServerDisconnected
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        _send_test_email()
+
+    smtp_server.return_value.sendmail.assert_called_once()
+
+
+def test_send_email_passes_other_refusals_on(smtp_server):
+    smtp_server.return_value.sendmail.side_effect = smtplib.SMTPSenderRefused(550, b"5.7.1 rejected", "me@myself.ai")
+
+    with pytest.raises(smtplib.SMTPSenderRefused):
+        _send_test_email()
+
+    assert smtp_server.call_count == 1
+
+
+def test_send_email_refuses_header_injection(mocker):
+    mocker.patch("smartschool.common._IS_WINDOWS", new=False)
+    mocker.patch.dict("smartschool.common._smtp_connections", clear=True)
+    server = mocker.patch("smtplib.SMTP")
+
+    with contextlib.redirect_stdout(StringIO()), pytest.raises(HeaderParseError):
+        send_email(subject="Test\nBcc: someone@else.ai", text="Just a test", email_to="me@myself.ai", email_from="me@myself.ai")
+
+    server.return_value.sendmail.assert_not_called()
 
 
 def test_multi_email_on_windows(mocker):
-    mocker.patch("platform.system", return_value="Windows")
+    mocker.patch("smartschool.common._IS_WINDOWS", new=True)
     server = mocker.patch("smtplib.SMTP")
 
     target = StringIO()
@@ -102,6 +269,7 @@ def test_as_float():
 
 def test_make_filesystem_safe():
     assert make_filesystem_safe("1 23?34_ab-'\".xml") == "1_23_34_ab-_.xml"
+    assert make_filesystem_safe("a__b _?c") == "a_b_c"
 
 
 def test_capture_and_email_all_exceptions(mocker):
@@ -141,12 +309,13 @@ def test_bs4_html():
     assert isinstance(sut, BeautifulSoup)
 
 
-def test_bs4_html_no_good_options(mocker):
-    mocker.patch("smartschool.common._used_bs4_option", new=None)
+def test_detect_bs4_features(mocker):
+    mocker.patch("smartschool.common.lxml_etree", new=object())
+    assert _detect_bs4_features() == "lxml"
 
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", category=GuessedAtParserWarning)
-        mocker.patch("smartschool.common.BeautifulSoup", side_effect=[FeatureNotFound, FeatureNotFound, FeatureNotFound, BeautifulSoup("<html />")])
+    mocker.patch("smartschool.common.lxml_etree", new=None)
+    find_spec = mocker.patch("importlib.util.find_spec", return_value=object())
+    assert _detect_bs4_features() == "html5lib"
 
-    sut = bs4_html("<html />")
-    assert isinstance(sut, BeautifulSoup)
+    find_spec.return_value = None
+    assert _detect_bs4_features() == "html.parser"
@@ -22,6 +22,7 @@ def _setup_smartschool_for_tests() -> None:
                 monkeypatch.setenv("SMARTSCHOOL_USERNAME", "bumba")
                 monkeypatch.setenv("SMARTSCHOOL_PASSWORD", "delu")
                 monkeypatch.setenv("SMARTSCHOOL_MAIN_URL", "site")
+                monkeypatch.setenv("SMARTSCHOOL_COURSES_CACHE_TTL", "0")
 
                 Smartschool.start(EnvCredentials())
 
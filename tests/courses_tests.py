@@ -1,4 +1,6 @@
+import pytest
 from smartschool import Courses, TopNavCourses
+from smartschool.session import session
 
 
 def test_topnav_courses_normal_flow():
@@ -13,3 +15,47 @@ def test_courses_normal_flow():
 
     assert sut[0].name == "Aardrijkskunde"
     assert sut[1].name == "Biologie"
+
+
+def test_courses_are_cached_across_instances(requests_mock):
+    first = list(Courses())
+    nr_of_calls = requests_mock.call_count
+
+    assert list(Courses()) == first
+    assert requests_mock.call_count == nr_of_calls
+
+
+def test_courses_disk_cache(tmp_path, monkeypatch, requests_mock):
+    monkeypatch.setenv("SMARTSCHOOL_COURSES_CACHE_TTL", "3600")
+
+    first = list(TopNavCourses())
+    nr_of_calls = requests_mock.call_count
+
+    TopNavCourses.cache.clear()  # Only the copy on disk is left now
+    assert list(TopNavCourses()) == first
+    assert requests_mock.call_count == nr_of_calls
+
+    TopNavCourses().refresh()
+    assert list(TopNavCourses()) == first
+    assert requests_mock.call_count > nr_of_calls
+
+
+@pytest.mark.parametrize("cls", [Courses, TopNavCourses])
+def test_courses_without_starting_smartschool(mocker, cls):
+    mocker.patch.object(session, "creds", new=None)
+
+    with pytest.raises(RuntimeError, match="Please start smartschool first"):
+        list(cls())
+
+
+def test_courses_corrupt_disk_cache_is_a_miss(tmp_path, monkeypatch, requests_mock):
+    monkeypatch.setenv("SMARTSCHOOL_COURSES_CACHE_TTL", "3600")
+
+    first = list(Courses())
+    nr_of_calls = requests_mock.call_count
+
+    Courses.cache.clear()
+    next(tmp_path.joinpath(".cache", "_courses").rglob("*.json")).write_text("[{")
+
+    assert list(Courses()) == first
+    assert requests_mock.call_count > nr_of_calls
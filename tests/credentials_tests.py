@@ -62,3 +62,12 @@ def test_path_credentials_empty(monkeypatch, make_empty):
 
     with pytest.raises(RuntimeError, match="Please verify and correct these attribute"):
         PathCredentials(_create_credentials_file(**args)).validate()
+
+
+def test_path_credentials_default_file_follows_cwd(tmp_path):
+    _create_credentials_file(user="user", pass_="pass", url="site")
+
+    sut = PathCredentials()
+
+    assert sut.filename == tmp_path / "credentials.yml"
+    assert sut.username == "user"
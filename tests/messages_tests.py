@@ -26,6 +26,15 @@ def test_fetch_attachments_happy_flow():
     assert sut[0].download().startswith(b"%PDF-1.6\r")
 
 
+def test_attachment_download_in_small_chunks(mocker):
+    attachment = next(iter(Attachments(123)))
+    expected = attachment.download()
+
+    mocker.patch("smartschool.objects._DOWNLOAD_CHUNK_SIZE", new=7)  # Not aligned on the 4-character base64 groups
+
+    assert attachment.download() == expected
+
+
 def test_message_unread_happy_flow():
     sut = MarkMessageUnread(msg_id=123).get()
 
@@ -8,17 +8,46 @@ def test_convert_to_datetime() -> None:
     expected = datetime(2023, 9, 1, 1, 2, 3, tzinfo=timezone(timedelta(hours=2)))
 
     assert convert_to_datetime("2023-09-01T01:02:03+02:00") == expected
+    assert convert_to_datetime("2023-09-01T01:02:03+0200") == expected
+    assert convert_to_datetime("2023-08-31T23:02:03Z") == expected
     assert convert_to_datetime(expected) == expected
 
     with pytest.raises(ValueError, match="No timezone information found in this date"):
         convert_to_datetime(expected.replace(tzinfo=None))
 
     assert convert_to_datetime("2023-09-01 01:02") == expected.replace(second=0, tzinfo=None)
+    assert convert_to_datetime("2023-9-1 1:02") == expected.replace(second=0, tzinfo=None)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2023-09-01",
+        "2023-09-01T01:02:03",
+        "2023-09-01 01:02:03",
+        "2023-09-01T01:02+02:00",
+        "2023-09-01 01:02:03+02:00",
+        "2023-W35-5T01:02:03+02:00",
+        "20230901T010203+0200",
+        "2023-09-01T01:02:03.5+02:00",
+        "2023-09-01T01:02:03.1234",
+    ],
+)
+def test_convert_to_datetime_rejects_other_iso_formats(value) -> None:
+    with pytest.raises(ValueError):
+        convert_to_datetime(value)
 
 
 def test_convert_to_date() -> None:
     expected = date(2023, 9, 1)
 
     assert convert_to_date("2023-09-01") == expected
+    assert convert_to_date("2023-9-1") == expected
     assert convert_to_date(expected) == expected
     assert convert_to_date(datetime.combine(expected, time.min)) == expected
+
+
+@pytest.mark.parametrize("value", ["20230901", "2023-W35-5"])
+def test_convert_to_date_rejects_other_iso_formats(value) -> None:
+    with pytest.raises(ValueError):
+        convert_to_date(value)
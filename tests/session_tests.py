@@ -22,3 +22,10 @@ def test_smartschool_already_logged_on(mocker, requests_mock):
 
 def test_smartschool_repr():
     assert repr(session) == "Smartschool(for: bumba)"
+
+
+def test_smartschool_pools_connections():
+    adapter = session._session.adapters["https://"]
+
+    assert adapter is session._session.adapters["http://"]
+    assert adapter.max_retries.total == 3